@@ -1,28 +1,60 @@
 # tkr_utils/__init__.py
 
+# The SDK helpers are resolved lazily (PEP 562) so `import tkr_utils` doesn't pull in
+# the openai/anthropic SDKs unless one of them is actually used.
+import importlib
+import logging
+from typing import TYPE_CHECKING, Any, List
+
+# Light, SDK-free modules are imported eagerly, in dependency order
 from .app_paths import *
 from .config_logging import *
 from .decorators import *
 from .error_handler import *
 from .extract_url import *
-from .helper_ollama import *
-from .helper_openai import *
-from .helper_anthropic import *
 
 from . import app_paths
 from . import config_logging
 from . import decorators
 from . import error_handler
-from . import extract_url
-from . import helper_ollama
-from . import helper_openai
-from . import helper_anthropic
+# Not `from . import extract_url`: that would rebind the extract_url function to its module
+
+if TYPE_CHECKING:
+    from .helper_openai import OpenAIHelper
+    from .helper_anthropic import AnthropicHelper, RequestMetadata, APIResponse, RateLimits, RequestProcessor
+
+# Library logging stays silent unless the application configures handlers
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+_submodules = ["helper_ollama", "helper_openai", "helper_anthropic"]
+
+# Mirrors each submodule's __all__; helper_openai's OpenAIHelper shadows helper_ollama's
+_lazy_imports = {
+    "OpenAIHelper": ".helper_openai",
+    "AnthropicHelper": ".helper_anthropic",
+    "RequestMetadata": ".helper_anthropic",
+    "APIResponse": ".helper_anthropic",
+    "RateLimits": ".helper_anthropic",
+    "RequestProcessor": ".helper_anthropic",
+}
 
 __all__ = ["app_paths", "config_logging", "decorators", "error_handler", "extract_url", "helper_ollama", "helper_openai", "helper_anthropic"]
 __all__.extend(app_paths.__all__)
 __all__.extend(config_logging.__all__)
 __all__.extend(decorators.__all__)
 __all__.extend(error_handler.__all__)
-__all__.extend(helper_ollama.__all__)
-__all__.extend(helper_openai.__all__)
-__all__.extend(helper_anthropic.__all__)
+__all__.extend(name for name in _lazy_imports if name not in __all__)
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_imports:
+        module = importlib.import_module(_lazy_imports[name], __name__)
+        value = getattr(module, name)
+    elif name in _submodules:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,20 @@
+# tkr_utils/_env.py
+import functools
+import os
+from dotenv import load_dotenv
+
+# Set once .env has been parsed; inherited by child processes so they skip the parse too
+_DOTENV_SENTINEL = "_TKR_DOTENV_LOADED"
+
+@functools.cache
+def ensure_env() -> bool:
+    """
+    Load environment variables from the .env file at most once per process.
+
+    Returns:
+        bool: Always True, once the environment has been loaded.
+    """
+    if not os.environ.get(_DOTENV_SENTINEL):
+        load_dotenv()
+        os.environ[_DOTENV_SENTINEL] = "1"
+    return True
@@ -0,0 +1,68 @@
+# tkr_utils/_loop_clients.py
+import asyncio
+from typing import Callable, Dict, Generic, TypeVar
+import httpx2
+
+C = TypeVar("C")
+
+class LoopClients(Generic[C]):
+    """SDK clients sharing one HTTP connection pool per event loop.
+
+    Helpers created per task or per batch reuse the loop's warm TCP/TLS connections.
+    Pooled connections are bound to the loop that opened them (and keep it alive), so
+    each loop, e.g. each asyncio.run(), gets its own pool and clients, held in plain
+    dicts and removed explicitly.
+    """
+
+    def __init__(
+        self,
+        make_pool: Callable[[], httpx2.AsyncClient],
+        make_client: Callable[[str, httpx2.AsyncClient], C]
+    ):
+        """
+        Args:
+            make_pool (Callable[[], httpx2.AsyncClient]): Builds a loop's connection pool.
+            make_client (Callable[[str, httpx2.AsyncClient], C]): Builds a client for an
+                API key over a pool.
+        """
+        self._make_pool = make_pool
+        self._make_client = make_client
+        self._pools: Dict[asyncio.AbstractEventLoop, httpx2.AsyncClient] = {}
+        self._clients: Dict[asyncio.AbstractEventLoop, Dict[str, C]] = {}
+        # Loops only keep weak references to their tasks
+        self._closers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    def get(self, api_key: str) -> C:
+        """Get the running loop's client for an API key, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None:
+            # A loop closed without cancelling its tasks (not through asyncio.run()) never ran
+            # its closer, and its pool can't be closed without the loop, so the entries are
+            # just dropped and the pool's sockets are closed when it is garbage collected
+            for stale in [other for other in self._clients if other.is_closed()]:
+                del self._clients[stale]
+                del self._pools[stale]
+                del self._closers[stale]
+            clients = self._clients[loop] = {}
+            self._pools[loop] = self._make_pool()
+            self._closers[loop] = loop.create_task(self._close_at_shutdown(loop))
+        client = clients.get(api_key)
+        if client is None:
+            client = clients[api_key] = self._make_client(api_key, self._pools[loop])
+        return client
+
+    async def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Wait until cancelled, then close the loop's pool. asyncio.run() cancels every task
+        before closing its loop, so the pool's connections are closed on the loop that owns them.
+        """
+        try:
+            await loop.create_future()
+        except asyncio.CancelledError:
+            del self._clients[loop]
+            del self._closers[loop]
+            await self._pools.pop(loop).aclose()
+            raise
+
+__all__ = ['LoopClients']
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+import orjson
+
+T = TypeVar("T")
+
+class ResponseCache(Generic[T]):
+    """In-memory LRU of API responses, keyed by a hash of the request.
+
+    Only deterministic (temperature 0) requests should be cached; the helpers
+    check that before calling key().
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize (int): Maximum number of cached responses.
+        """
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, T]" = OrderedDict()
+        # Tasks for requests currently in flight, keyed like the cache
+        self._inflight: "Dict[str, asyncio.Task[T]]" = {}
+
+    @staticmethod
+    def key(**request: Any) -> Optional[str]:
+        """
+        Build a cache key from the request parameters.
+
+        Returns:
+            Optional[str]: sha256 hex digest of the parameters, or None if they
+            aren't JSON serializable (the request is then not cached).
+        """
+        try:
+            return hashlib.sha256(orjson.dumps(request, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        except TypeError:
+            return None
+
+    def get(self, key: Optional[str]) -> Optional[T]:
+        """Get a cached response and mark it as most recently used."""
+        if key is None:
+            return None
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Optional[str], value: T) -> None:
+        """Cache a response, evicting the least recently used one when full."""
+        if key is None:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def fetch(
+        self,
+        key: Optional[str],
+        call: Callable[[], Awaitable[T]],
+        use_cache: bool = True,
+        cacheable: Callable[[T], bool] = lambda response: True
+    ) -> T:
+        """
+        Await call() unless the response is cached, sharing one call between identical
+        requests made while it is in flight.
+
+        The call runs in its own task and every caller, the first one included, awaits
+        it through asyncio.shield, so cancelling one caller doesn't cancel the request
+        for the others.
+
+        Args:
+            key (Optional[str]): Cache key from key(); None sends the request uncached.
+            call (Callable[[], Awaitable[T]]): Makes the request.
+            use_cache (bool): Look up and store the response in the cache. When False,
+                identical in-flight requests are still shared.
+            cacheable (Callable[[T], bool]): Whether a response may be cached.
+
+        Returns:
+            T: The response.
+        """
+        if key is None:
+            return await call()
+
+        if use_cache:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(call())
+
+            def done(task: "asyncio.Task[T]") -> None:
+                del self._inflight[key]
+                # exception() also marks a failure as retrieved if every caller was cancelled
+                if not task.cancelled() and task.exception() is None:
+                    response = task.result()
+                    if use_cache and cacheable(response):
+                        self.put(key, response)
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+__all__ = ['ResponseCache']
@@ -0,0 +1,41 @@
+# tkr_utils/_stdout.py
+import sys
+from typing import AsyncIterable, Iterable, List
+
+# Streamed text is written to stdout every this many chunks instead of once per chunk
+_CHUNKS_PER_WRITE = 32
+
+def _flush(buffer: List[str]) -> None:
+    sys.stdout.write("".join(buffer))
+    sys.stdout.flush()
+    buffer.clear()
+
+def write_buffered(chunks: Iterable[str]) -> None:
+    """
+    Write streamed text chunks to stdout, batching the writes.
+
+    Args:
+        chunks (Iterable[str]): Text chunks, in order.
+    """
+    buffer: List[str] = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= _CHUNKS_PER_WRITE:
+            _flush(buffer)
+    _flush(buffer)
+
+async def write_buffered_async(chunks: AsyncIterable[str]) -> None:
+    """
+    Write asynchronously streamed text chunks to stdout, batching the writes.
+
+    Args:
+        chunks (AsyncIterable[str]): Text chunks, in order.
+    """
+    buffer: List[str] = []
+    async for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= _CHUNKS_PER_WRITE:
+            _flush(buffer)
+    _flush(buffer)
+
+__all__ = ['write_buffered', 'write_buffered_async']
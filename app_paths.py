@@ -1,99 +1,169 @@
+import os
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Dict, List, Set
 from tkr_utils.decorators import logs_and_exceptions
+from tkr_utils._env import ensure_env
 
 ## Logging is can't use tkr_utils.setup_logging'because of circular imports
 # todo: create a logging_config.yaml for both app_paths and setup_logging to use
+# No handlers are installed here: records propagate to whatever the application configured
 import logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__file__)
-
-load_dotenv()
-
-class AppPaths:
-    # Create Default directories
-    BASE_DIR: Path = Path(__file__).resolve().parent.parent
-    LOCAL_DATA: Path = BASE_DIR / "_local_data"
-    LOG_DIR: Path = LOCAL_DATA / "_logs"
-
-    # Instantiate an empty array for the diectories added by other modules/packages
-    _added_directories: list = []
-
-    # The method to add utility directories to _local_data
-    @staticmethod
-    @logs_and_exceptions(logger)
-    def add(name: str, storage: bool = False, test: bool = False, project_directory: Path = None) -> None:
-        """
-        Add a new path to the AppPaths class. If storage is True, create a storage directory.
-        If test is True, create a test directory structure under the provided project directory.
-
-        Args:
-            name (str): The name of the new path.
-            storage (bool): Whether to create a storage directory.
-            test (bool): Whether to create a test directory.
-            project_directory (Path): The project directory where tests will be run.
-        """
-        logger.debug(f"Adding new path: {name} with storage: {storage} and test: {test}")
-
-        # Check if the Storage or Test arguments are used
-        # These are used by tkr_stores and tkr_tests to ensure the proper diectory structure is maintained
-        if storage and test:
-            raise ValueError("Cannot set both storage and test to True.")
-
-        if storage:
-            store_name = f"{name.upper()}_STORE"
-            db_path_name = f"{name.upper()}_DB_PATH"
-            store_path = AppPaths.STORES_DIR / name.lower()
-            db_path = store_path / f"{name.lower()}.db"
-
-            setattr(AppPaths, store_name, store_path)
-            setattr(AppPaths, db_path_name, db_path)
-
-            AppPaths._added_directories.append(store_path)
-            AppPaths._check_directory(store_path)
-
-        elif test and project_directory:
-            test_dir = project_directory / name.lower()
-            setattr(AppPaths, f"{name.upper()}_TEST_DIR", test_dir)
-
-            AppPaths._added_directories.append(test_dir)
-            AppPaths._check_directory(test_dir)
-
-        else:
-            dir_path = AppPaths.LOCAL_DATA / name.lower()
-            setattr(AppPaths, name.upper() + "_DIR", dir_path)
-            AppPaths._added_directories.append(dir_path)
-            AppPaths._check_directory(dir_path)
-
-    @staticmethod
-    @logs_and_exceptions(logger)
-    def check_directories() -> None:
-        """
-        Ensure all directories exist, create them if they don't.
-        """
-        logger.debug("Checking all directories.")
-        directories = [
-            AppPaths.LOG_DIR,
-            *AppPaths._added_directories
-        ]
-        for directory in directories:
-            AppPaths._check_directory(directory)
-
-    # Check if the diectories exist. If not, create them.
-    @staticmethod
-    @logs_and_exceptions(logger)
-    def _check_directory(directory: Path) -> None:
-        """
-        Check if a directory exists, create it if it doesn't.
-
-        Args:
-            directory (Path): The directory to check and create if necessary.
-        """
-        if not directory.exists():
-            logger.info(f"Creating directory: {directory}")
-            directory.mkdir(parents=True, exist_ok=True)
-
-# When imported check the directories
-AppPaths.check_directories()
+logger = logging.getLogger(__name__)
+
+# Load environment variables from .env file (once per process)
+ensure_env()
+
+# Create Default directories
+# abspath is a getcwd + string normalisation; Path.resolve() would stat every path component
+BASE_DIR: Path = Path(os.path.abspath(__file__)).parent.parent
+LOCAL_DATA: Path = BASE_DIR / "_local_data"
+LOG_DIR: Path = LOCAL_DATA / "_logs"
+
+# Every named path, including the ones added by other modules/packages (e.g. "DOCS_DIR", "NOTES_STORE").
+# Kept in a dict rather than set on a class so registering a path doesn't mutate a type.
+paths: Dict[str, Path] = {
+    "BASE_DIR": BASE_DIR,
+    "LOCAL_DATA": LOCAL_DATA,
+    "LOG_DIR": LOG_DIR,
+}
+
+# Directories added by other modules/packages, as an insertion-ordered set
+_added_directories: Dict[Path, None] = {}
+
+# Directories already checked/created this process, so each one is only touched once
+_ensured: Set[Path] = set()
+
+# The method to add utility directories to _local_data
+@logs_and_exceptions(logger)
+def add(name: str, storage: bool = False, test: bool = False, project_directory: Path = None) -> Path:
+    """
+    Register a new named path. If storage is True, register a storage directory.
+    If test is True, register a test directory under the provided project directory.
+    Directories are created on first use via path() or by check_directories().
+
+    Args:
+        name (str): The name of the new path.
+        storage (bool): Whether to create a storage directory.
+        test (bool): Whether to create a test directory.
+        project_directory (Path): The project directory where tests will be run.
+
+    Returns:
+        Path: The registered directory.
+    """
+    logger.debug("Adding new path: %s with storage: %s and test: %s", name, storage, test)
+
+    # Check if the Storage or Test arguments are used
+    # These are used by tkr_stores and tkr_tests to ensure the proper diectory structure is maintained
+    if storage and test:
+        raise ValueError("Cannot set both storage and test to True.")
+
+    name_lower = name.lower()
+    name_upper = name.upper()
+
+    # Join as strings and build each Path once instead of parsing through Path.__truediv__
+    if storage:
+        if "STORES_DIR" not in paths:
+            raise ValueError("Add a 'stores' path before adding storage paths.")
+        store_dir = os.path.join(str(paths["STORES_DIR"]), name_lower)
+        store_path = Path(store_dir)
+
+        paths[f"{name_upper}_STORE"] = store_path
+        paths[f"{name_upper}_DB_PATH"] = Path(os.path.join(store_dir, f"{name_lower}.db"))
+
+        _added_directories.setdefault(store_path, None)
+        return store_path
+
+    elif test and project_directory:
+        test_dir = Path(os.path.join(str(project_directory), name_lower))
+        paths[f"{name_upper}_TEST_DIR"] = test_dir
+
+        _added_directories.setdefault(test_dir, None)
+        return test_dir
+
+    else:
+        dir_path = Path(os.path.join(str(LOCAL_DATA), name_lower))
+        paths[name_upper + "_DIR"] = dir_path
+        _added_directories.setdefault(dir_path, None)
+        return dir_path
+
+def path(name: str) -> Path:
+    """
+    Get a named path, creating its directory the first time it is requested.
+    Directory entries (e.g. "LOG_DIR", "DOCS_STORE") are created themselves;
+    for file entries (e.g. "NOTES_DB_PATH") the parent directory is created.
+
+    Args:
+        name (str): The path name, e.g. "LOG_DIR" or "NOTES_DB_PATH".
+
+    Returns:
+        Path: The registered path.
+    """
+    registered = paths[name]
+    if name.endswith("_DB_PATH"):
+        directory = registered.parent
+    elif name.endswith(("_DIR", "_STORE")) or name == "LOCAL_DATA":
+        directory = registered
+    else:
+        return registered
+    if directory not in _ensured:
+        _check_directory(directory)
+    return registered
+
+@logs_and_exceptions(logger)
+def check_directories() -> None:
+    """
+    Ensure all directories exist, create them if they don't.
+    Call this explicitly when every registered directory is needed up front.
+    """
+    logger.debug("Checking all directories.")
+    # _check_directory skips anything already ensured, so only new directories are created
+    _check_directory(LOG_DIR)
+    for directory in _added_directories:
+        _check_directory(directory)
+
+# Create the directory if it doesn't exist yet.
+# Leaf helper, so it logs its own failure instead of going through logs_and_exceptions.
+def _check_directory(directory: Path) -> None:
+    """
+    Create a directory if it doesn't exist.
+
+    Args:
+        directory (Path): The directory to check and create if necessary.
+    """
+    if directory in _ensured:
+        return
+    # mkdir(exist_ok=True) is a single syscall that fails cheaply with EEXIST, no exists() probe needed
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.error("mkdir %s failed: %s", directory, e)
+        raise
+    _ensured.add(directory)
+
+class _AppPathsMeta(type):
+    """Resolves the named paths (e.g. AppPaths.DOCS_DIR) through path(), so their directories exist on first use."""
+
+    def __getattr__(cls, name: str) -> Path:
+        if name not in paths:
+            raise AttributeError(f"type object 'AppPaths' has no attribute {name!r}")
+        return path(name)
+
+    def __dir__(cls) -> List[str]:
+        return sorted(set(super().__dir__()) | set(paths))
+
+class AppPaths(metaclass=_AppPathsMeta):
+    """Backwards compatible namespace over the module-level paths API."""
+    # Annotated only: the values come from _AppPathsMeta.__getattr__, which creates the directory
+    BASE_DIR: Path
+    LOCAL_DATA: Path
+    LOG_DIR: Path
+
+    _added_directories = _added_directories
+    _ensured = _ensured
+
+    add = staticmethod(add)
+    path = staticmethod(path)
+    check_directories = staticmethod(check_directories)
+    _check_directory = staticmethod(_check_directory)
 
 __all__ = ['AppPaths']
@@ -1,7 +1,7 @@
-from dotenv import load_dotenv
 import os
+from ._env import ensure_env
 
-load_dotenv()
+ensure_env()
 
 # OpenAI
 
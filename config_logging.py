@@ -1,19 +1,50 @@
 # /utils/config_logging.py
-from pathlib import Path
+import atexit
+import os
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
-from .app_paths import AppPaths
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from . import app_paths
 
-def setup_logging(file_path: str, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s') -> logging.Logger:
-    logger_name = Path(file_path).stem + "_logger"
+# Loggers only enqueue records; one background listener thread does the file writes
+# and rollovers for every logger configured by setup_logging
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+_DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_default_formatter = logging.Formatter(_DEFAULT_FORMAT)
+
+def _get_listener() -> QueueListener:
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(_log_queue)
+        _listener.start()
+        # Flush whatever is still queued on shutdown
+        atexit.register(_listener.stop)
+    return _listener
+
+def setup_logging(file_path: str, level=logging.INFO, format=_DEFAULT_FORMAT) -> logging.Logger:
+    logger_name = os.path.splitext(os.path.basename(file_path))[0] + "_logger"
     logger = logging.getLogger(logger_name)
+
+    # Already configured (e.g. a module re-importing or sharing a file stem): reuse it
+    # rather than opening another file handler on the same log file
+    if logger.handlers:
+        return logger
+
     logger.setLevel(level)
 
-    formatter = logging.Formatter(format)
-    log_file = AppPaths.LOG_DIR / f"{logger_name}.log"
+    formatter = _default_formatter if format == _DEFAULT_FORMAT else logging.Formatter(format)
+    log_file = app_paths.path("LOG_DIR") / f"{logger_name}.log"
     file_handler = RotatingFileHandler(log_file, maxBytes=10485760, backupCount=10)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    # The listener is shared, so each file only accepts records from its own logger
+    file_handler.addFilter(logging.Filter(logger_name))
+
+    listener = _get_listener()
+    listener.handlers = (*listener.handlers, file_handler)
+    logger.addHandler(QueueHandler(_log_queue))
 
     return logger
 
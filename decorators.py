@@ -4,18 +4,39 @@ import logging
 import asyncio
 from typing import Callable, Any
 
-def logs_and_exceptions(logger: logging.Logger) -> Callable:
+def logs_and_exceptions(logger: logging.Logger, fast: bool = False) -> Callable:
     """
     Decorator to log and handle exceptions for both synchronous and asynchronous functions.
 
+    Whether to log debug start/finish messages is decided once, when the function is
+    decorated: if the logger's effective level is above DEBUG, only exception logging
+    is wrapped around the function.
+
     Args:
         logger (logging.Logger): The logger instance to use for logging.
+        fast (bool): Return the function unwrapped, for hot helpers where even the
+            exception logging wrapper costs too much.
 
     Returns:
         Callable: The decorated function.
     """
     def decorator(func: Callable) -> Callable:
+        if fast:
+            return func
+
+        exceptions_only = logger.getEffectiveLevel() > logging.DEBUG
+
         if asyncio.iscoroutinefunction(func):
+            if exceptions_only:
+                @functools.wraps(func)
+                async def async_exception_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        logger.error("Exception in function %s: %s", func.__name__, str(e))
+                        raise
+                return async_exception_wrapper
+
             @functools.wraps(func)
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
                 try:
@@ -28,6 +49,16 @@ def logs_and_exceptions(logger: logging.Logger) -> Callable:
                     raise
             return async_wrapper
         else:
+            if exceptions_only:
+                @functools.wraps(func)
+                def sync_exception_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    try:
+                        return func(*args, **kwargs)
+                    except Exception as e:
+                        logger.error("Exception in function %s: %s", func.__name__, str(e))
+                        raise
+                return sync_exception_wrapper
+
             @functools.wraps(func)
             def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
                 try:
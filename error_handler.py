@@ -8,7 +8,7 @@ def req_exception(e: Exception, url: str = "") -> None:
         e (Exception): The exception that occurred.
         url (str): The URL where the request failed.
     """
-    logging.error(f"Request failed for {url}: {e}")
+    logging.error("Request failed for %s: %s", url, e)
 
 def db_exception(e: Exception, query: str = "") -> None:
     """
@@ -18,7 +18,7 @@ def db_exception(e: Exception, query: str = "") -> None:
         e (Exception): The exception that occurred.
         query (str): The SQL query that caused the exception.
     """
-    logging.error(f"Database error during query '{query}': {e}")
+    logging.error("Database error during query '%s': %s", query, e)
 
 def stg_exception(e: Exception, filename: str = "") -> None:
     """
@@ -28,7 +28,7 @@ def stg_exception(e: Exception, filename: str = "") -> None:
         e (Exception): The exception that occurred.
         filename (str): The name of the file involved in the exception.
     """
-    logging.error(f"Storage error for file {filename}: {e}")
+    logging.error("Storage error for file %s: %s", filename, e)
 
 def general_exception(e: Exception, context: str = "") -> None:
     """
@@ -38,6 +38,6 @@ def general_exception(e: Exception, context: str = "") -> None:
         e (Exception): The exception that occurred.
         context (str): Additional context about where the error occurred.
     """
-    logging.error(f"An unexpected error occurred in {context}: {e}")
+    logging.error("An unexpected error occurred in %s: %s", context, e)
 
 __all__ = ["req_exception", "db_exception", "stg_exception", "general_exception"]
\ No newline at end of file
@@ -4,6 +4,8 @@ from tkr_utils import setup_logging, logs_and_exceptions
 
 logger=setup_logging(__file__)
 
+_URL_RE = re.compile(r'https?://\S+')
+
 @logs_and_exceptions(logger)
 def extract_url(query: str) -> Optional[str]:
     """
@@ -15,6 +17,7 @@ def extract_url(query: str) -> Optional[str]:
     Returns:
         Optional[str]: The first URL found in the query, or None if no URL is found.
     """
-    url_pattern = re.compile(r'https?://\S+')
-    match = url_pattern.search(query)
+    match = _URL_RE.search(query)
     return match.group(0) if match else None
+
+__all__ = ['extract_url']
@@ -1,7 +1,21 @@
 # tkr_bias_stories/tkr_utils/helper_anthropic/__init__.py
-from .client import AnthropicHelper
-from .models import RequestMetadata, APIResponse, RateLimits
-from .processor import RequestProcessor
+
+# Resolved lazily (PEP 562) so the anthropic SDK is only imported when a helper is used
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .client import AnthropicHelper
+    from .models import RequestMetadata, APIResponse, RateLimits
+    from .processor import RequestProcessor
+
+_lazy_imports = {
+    'AnthropicHelper': '.client',
+    'RequestMetadata': '.models',
+    'APIResponse': '.models',
+    'RateLimits': '.models',
+    'RequestProcessor': '.processor',
+}
 
 __all__ = [
     'AnthropicHelper',
@@ -10,3 +24,13 @@ __all__ = [
     'RateLimits',
     'RequestProcessor'
 ]
+
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
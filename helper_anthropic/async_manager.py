@@ -1,9 +1,10 @@
 # tkr_bias_stories/tkr_utils/helper_anthropic/async_manager.py
 
 import asyncio
+import itertools
 import time
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from tkr_utils import setup_logging, logs_and_exceptions
 from .models import RateLimits
 
@@ -17,51 +18,94 @@ class CircuitBreakerConfig:
     half_open_timeout: float = 5.0  # seconds
 
 class CircuitBreaker:
-    """Implements circuit breaker pattern for API requests."""
+    """Implements circuit breaker pattern for API requests.
+
+    State transitions never span an await, so no lock is needed as long as the
+    breaker is only used from a single event loop.
+    """
 
     def __init__(self, config: CircuitBreakerConfig):
         self.config = config
         self.failures = 0
         self.last_failure_time = 0
         self.state = "closed"  # closed, open, half-open
-        self._lock = asyncio.Lock()
 
     async def record_failure(self):
         """Record a failure and potentially open the circuit."""
-        async with self._lock:
-            self.failures += 1
-            self.last_failure_time = time.time()
-            if self.failures >= self.config.failure_threshold:
-                self.state = "open"
-                logger.warning("Circuit breaker opened due to %d failures", self.failures)
-
-    async def can_execute(self) -> bool:
-        """Check if a request can be executed based on circuit state."""
-        async with self._lock:
-            if self.state == "closed":
-                return True
+        self.failures += 1
+        self.last_failure_time = time.monotonic()
+        if self.failures >= self.config.failure_threshold:
+            self.state = "open"
+            logger.warning("Circuit breaker opened due to %d failures", self.failures)
 
-            if self.state == "open":
-                if time.time() - self.last_failure_time > self.config.reset_timeout:
-                    self.state = "half-open"
-                    return True
-                return False
+    def can_execute(self) -> bool:
+        """Check if a request can be executed based on circuit state."""
+        # Fast path for the common closed state
+        if self.state == "closed":
+            return True
 
-            # Half-open state
-            if time.time() - self.last_failure_time > self.config.half_open_timeout:
+        if self.state == "open":
+            if time.monotonic() - self.last_failure_time > self.config.reset_timeout:
+                self.state = "half-open"
                 return True
             return False
 
+        # Half-open state
+        if time.monotonic() - self.last_failure_time > self.config.half_open_timeout:
+            return True
+        return False
+
     async def record_success(self):
         """Record a successful request and potentially close the circuit."""
-        async with self._lock:
-            if self.state == "half-open":
-                self.state = "closed"
-                self.failures = 0
-                logger.info("Circuit breaker closed after successful request")
+        if self.state == "half-open":
+            self.state = "closed"
+            self.failures = 0
+            logger.info("Circuit breaker closed after successful request")
+
+class TokenBucket:
+    """Token bucket that refills continuously at a fixed rate.
+
+    Like the rest of this module, it is only safe to use from a single event loop.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        """Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of tokens the bucket holds
+            rate: Tokens added per second
+        """
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = self.capacity
+        self.ts = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+
+    async def acquire(self, n: float = 1) -> None:
+        """Take n tokens, sleeping until enough have accrued.
+
+        Requests larger than the capacity are clamped to it, so they wait for a
+        full bucket instead of forever.
+        """
+        n = min(n, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            await asyncio.sleep((n - self.tokens) / self.rate)
 
 class AsyncRequestManager:
-    """Manages async request orchestration with rate limiting and circuit breaking."""
+    """Manages async request orchestration with rate limiting and circuit breaking.
+
+    Counters are updated without locks: a manager must only be used from a single
+    event loop, where nothing can interleave between two await points.
+    """
 
     def __init__(
         self,
@@ -84,15 +128,19 @@ class AsyncRequestManager:
         # Initialize but don't create semaphore yet
         self._semaphore = None
 
-        # Rate limiting state
-        self.requests_made = 0
-        self.tokens_used = 0
-        self.last_reset = time.time()
-        self._rate_limit_lock = asyncio.Lock()
+        # Token buckets start full and refill continuously at the per-minute rates,
+        # so there is no burst edge at a minute boundary
+        self.request_bucket = TokenBucket(
+            rate_limits.requests_per_minute,
+            rate_limits.requests_per_minute / 60.0
+        )
+        self.token_bucket = TokenBucket(
+            rate_limits.tokens_per_minute,
+            rate_limits.tokens_per_minute / 60.0
+        )
 
         # Track active permits
         self._active_permits = 0
-        self._permits_lock = asyncio.Lock()
 
         logger.info(
             "AsyncRequestManager initialized with max_concurrent=%d, chunk_size=%d",
@@ -107,54 +155,46 @@ class AsyncRequestManager:
             self._semaphore = asyncio.Semaphore(self._max_concurrent)
         return self._semaphore
 
-    def chunk_requests(self, requests: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
-        """Split requests into chunks for processing."""
-        return [
-            requests[i:i + self.chunk_size]
-            for i in range(0, len(requests), self.chunk_size)
-        ]
-
-    async def check_rate_limits(self, tokens: int = 0) -> bool:
-        """Check if request can proceed under rate limits."""
-        async with self._rate_limit_lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_reset
-
-            # Reset counters if minute has elapsed
-            if elapsed >= 60:
-                self.requests_made = 0
-                self.tokens_used = 0
-                self.last_reset = current_time
-                return True
+    def chunk_requests(self, requests: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Lazily split requests into chunks for processing.
 
-            # Check limits
-            if (self.requests_made >= self.rate_limits.requests_per_minute or
-                self.tokens_used + tokens >= self.rate_limits.tokens_per_minute):
-                return False
+        Chunks are built one at a time, so only the chunk in flight is held in
+        memory. Wrap in list() if all chunks are needed up front.
+        """
+        it = iter(requests)
+        while True:
+            chunk = list(itertools.islice(it, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
 
-            # Update counters
-            self.requests_made += 1
-            self.tokens_used += tokens
-            return True
+    async def acquire_permit(self, tokens: int = 0) -> bool:
+        """Acquire permission to make a request checking all constraints.
+
+        Waits for a concurrency slot and then for the rate limit buckets to hold
+        one request and the estimated tokens, so callers are backpressured
+        instead of rejected when over the rate limit.
 
-    async def acquire_permit(self) -> bool:
-        """Acquire permission to make a request checking all constraints."""
-        if not await self.circuit_breaker.can_execute():
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        if not self.circuit_breaker.can_execute():
             logger.warning("Circuit breaker preventing request execution")
             return False
 
+        await self.semaphore.acquire()
+        self._active_permits += 1
         try:
-            await self.semaphore.acquire()
-            async with self._permits_lock:
-                self._active_permits += 1
-
-            if await self.check_rate_limits():
-                return True
+            # Rate limits are spent only once a slot is held, so queued requests don't consume them
+            await self.request_bucket.acquire(1)
+            if tokens:
+                await self.token_bucket.acquire(tokens)
+            return True
 
-            # Release if rate limits exceeded
+        except asyncio.CancelledError:
+            # The bucket waits can take up to a minute; a cancelled waiter mustn't keep its slot
             await self.release_permit()
-            return False
-
+            raise
         except Exception as e:
             logger.error("Error acquiring request permit: %s", str(e))
             await self.release_permit()
@@ -165,9 +205,8 @@ class AsyncRequestManager:
         try:
             if self._semaphore is not None:
                 self._semaphore.release()
-                async with self._permits_lock:
-                    if self._active_permits > 0:
-                        self._active_permits -= 1
+                if self._active_permits > 0:
+                    self._active_permits -= 1
         except ValueError:  # Handle case where release called without acquire
             logger.warning("Attempted to release an unacquired permit")
         except Exception as e:
@@ -177,9 +216,8 @@ class AsyncRequestManager:
         """Clean up resources and ensure all permits are released."""
         try:
             # Release any remaining permits
-            async with self._permits_lock:
-                while self._active_permits > 0:
-                    await self.release_permit()
+            while self._active_permits > 0:
+                await self.release_permit()
 
             # Clear the semaphore
             self._semaphore = None
@@ -1,68 +1,103 @@
 # tkr_bias_stories/tkr_utils/helper_anthropic/client.py
 
 import asyncio
-import json
+import functools
+import logging
+import os
 from typing import List, Dict, Any, Optional, Union, AsyncGenerator
-from anthropic import Anthropic
+import httpx2
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient, RateLimitError, Timeout
 from tkr_utils import setup_logging, logs_and_exceptions
+from tkr_utils._loop_clients import LoopClients
+from tkr_utils._response_cache import ResponseCache
 from .models import APIResponse
 
 logger = setup_logging(__file__)
 
+# Most requests the Message Batches API accepts in a single batch
+_MAX_BATCH_REQUESTS = 10_000
+
+# AsyncAnthropic clients keyed by API key, sharing one HTTP/2 connection pool per event loop
+_clients: LoopClients[AsyncAnthropic] = LoopClients(
+    lambda: DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx2.Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=Timeout(600.0, connect=5.0)
+    ),
+    lambda api_key, pool: AsyncAnthropic(api_key=api_key, http_client=pool)
+)
+
+def _get_client(api_key: str) -> AsyncAnthropic:
+    """Get the running loop's shared AsyncAnthropic client for an API key, creating it on first use."""
+    return _clients.get(api_key)
+
+def _to_api_response(response: Any) -> APIResponse:
+    """Build an APIResponse from an Anthropic Message."""
+    content = response.content[0].text if response.content else ""
+
+    return APIResponse(
+        content=content,  # Now properly JSON formatted
+        request_id=response.id,
+        success=True,
+        metadata={
+            "usage": {
+                "total_tokens": response.usage.output_tokens + response.usage.input_tokens,
+                "input_tokens": response.usage.input_tokens,
+                "output_tokens": response.usage.output_tokens
+            },
+            "model": response.model,
+            "role": response.role,
+            "stop_reason": response.stop_reason,
+            "stop_sequence": response.stop_sequence
+        }
+    )
+
 class AnthropicHelper:
     """Helper class to interact with the Anthropic API asynchronously."""
 
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "claude-3-sonnet-20240307"
+        model: str = "claude-3-sonnet-20240307",
+        enable_cache: bool = True,
+        cache_size: int = 1024
     ):
         """Initialize Anthropic client with API key and model.
 
         Args:
             api_key: Anthropic API key
             model: Model identifier to use
+            enable_cache: Cache responses to deterministic (temperature 0) requests
+            cache_size: Maximum number of cached responses
         """
         if not api_key:
             raise ValueError("Anthropic API key is required")
 
         self.api_key = api_key
         self.model = model
-        self.client = Anthropic(api_key=self.api_key)
-        self.loop = None  # Initialize loop as None, will be set when needed
-
-        logger.info("AnthropicHelper initialized with model: %s", self.model)
-
-    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
-        """Ensure we have a running event loop.
+        # messages.create with the model baked in, rebound when the loop's client changes
+        self._create_client: Optional[AsyncAnthropic] = None
+        self._create_fn: Any = None
 
-        Returns:
-            The current event loop
-        """
-        try:
-            self.loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # If no loop is running, create and set a new one
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-        return self.loop
+        self.enable_cache = enable_cache
+        self.cache_size = cache_size
+        self._cache: ResponseCache[APIResponse] = ResponseCache(cache_size)
 
-    async def _run_in_executor(self, func: Any, *args: Any, **kwargs: Any) -> Any:
-        """Run synchronous client methods in thread pool.
+        logger.info("AnthropicHelper initialized with model: %s", self.model)
 
-        Args:
-            func: Function to execute
-            *args: Positional arguments
-            **kwargs: Keyword arguments
+    @property
+    def client(self) -> AsyncAnthropic:
+        """Native async client for the running event loop, over the loop's shared connection pool."""
+        return _get_client(self.api_key)
 
-        Returns:
-            Response from function execution
-        """
-        self._ensure_loop()
-        return await self.loop.run_in_executor(
-            None,
-            lambda: func(*args, **kwargs)
-        )
+    @property
+    def _create(self) -> Any:
+        """messages.create with the model baked in, so each call skips the dict build and ** unpacking."""
+        client = self.client
+        if client is not self._create_client:
+            self._create_fn = functools.partial(client.messages.create, model=self.model)
+            self._create_client = client
+        return self._create_fn
 
     @logs_and_exceptions(logger)
     async def send_message(
@@ -70,7 +105,10 @@ class AnthropicHelper:
         messages: List[Dict[str, Any]],
         temperature: float = 0.0,
         max_tokens: int = 1024,
-        stream: bool = False
+        stream: bool = False,
+        system: Optional[Union[str, List[Dict[str, Any]]]] = None,
+        cache_prefix: bool = False,
+        batch_window: float = 0.05
     ) -> Union[APIResponse, AsyncGenerator[str, None]]:
         """Send a message to the Anthropic API with option to stream.
 
@@ -79,68 +117,64 @@ class AnthropicHelper:
             temperature: Sampling temperature (0.0-1.0)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            system: Optional system prompt, as a string or a list of content blocks
+            cache_prefix: Mark a string system prompt as a prompt-cache breakpoint so a
+                prefix shared across requests is served from Anthropic's prompt cache
+            batch_window: When streaming, seconds to coalesce text deltas before yielding
+                them; 0 yields every delta as it arrives
 
         Returns:
             Either APIResponse object or AsyncGenerator for streaming
         """
+        # Checked once so disabled debug logging costs nothing per call
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
-            logger.debug("Sending message to Anthropic API")
-            logger.debug("Messages: %s", messages)
-
-            # Format messages for Anthropic API
-            anthropic_messages = [
-                {
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                }
-                for msg in messages
-            ]
-
-            # Create message parameters
-            message_params = {
-                "messages": anthropic_messages,
-                "model": self.model,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "stream": stream
-            }
+            if debug:
+                logger.debug("Sending message to Anthropic API")
+                logger.debug("Messages: %s", messages)
 
-            # Call Anthropic API in executor
-            response = await self._run_in_executor(
-                self.client.messages.create,
-                **message_params
-            )
+            # Format messages for Anthropic API; messages that are already exactly
+            # {"role", "content"} dicts (the common case) are sent without copying
+            if all(len(msg) == 2 and "role" in msg and "content" in msg for msg in messages):
+                anthropic_messages = messages
+            else:
+                anthropic_messages = [
+                    {
+                        "role": msg.get("role", "user"),
+                        "content": msg.get("content", "")
+                    }
+                    for msg in messages
+                ]
 
-            logger.debug("Received response from Anthropic API")
-            logger.debug("Response ID: %s", response.id)
+            if system is not None and cache_prefix and isinstance(system, str):
+                system = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
 
             if stream:
-                return self._stream_response(response)
-
-            content = response.content[0].text if response.content else ""
-
-            # Create API response
-            api_response = APIResponse(
-                content=content,  # Now properly JSON formatted
-                request_id=response.id,
-                success=True,
-                metadata={
-                    "usage": {
-                        "total_tokens": response.usage.output_tokens + response.usage.input_tokens,
-                        "input_tokens": response.usage.input_tokens,
-                        "output_tokens": response.usage.output_tokens
-                    },
-                    "model": response.model,
-                    "role": response.role,
-                    "stop_reason": response.stop_reason,
-                    "stop_sequence": getattr(response, 'stop_sequence', None)
+                # Create message parameters
+                message_params = {
+                    "messages": anthropic_messages,
+                    "model": self.model,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature
                 }
-            )
+                if system is not None:
+                    message_params["system"] = system
+                return self._stream_response(message_params, batch_window)
 
-            logger.debug("Created APIResponse object")
-            logger.debug("Response content preview: %s", content[:100] if content else "Empty content")
+            # Deterministic requests are answered from the cache, and identical ones
+            # already in flight share a single API call
+            cache_key = None
+            if temperature == 0:
+                cache_key = self._cache.key(m=self.model, msgs=anthropic_messages, mt=max_tokens, sys=system)
+            if cache_key is None:
+                return await self._request(anthropic_messages, max_tokens, temperature, system, debug)
 
-            return api_response
+            return await self._cache.fetch(
+                cache_key,
+                lambda: self._request(anthropic_messages, max_tokens, temperature, system, debug),
+                self.enable_cache,
+                cacheable=lambda response: response.success
+            )
 
         except Exception as e:
             logger.error("Error in send_message: %s", str(e))
@@ -153,20 +187,251 @@ class AnthropicHelper:
                 )
             raise
 
-    async def _stream_response(self, response: Any) -> AsyncGenerator[str, None]:
-        """Process streaming response from Anthropic API.
+    async def _request(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+        system: Optional[Union[str, List[Dict[str, Any]]]],
+        debug: bool
+    ) -> APIResponse:
+        """Make one non-streaming messages API call, mapping errors to a failed APIResponse."""
+        try:
+            # Call Anthropic API directly on the event loop
+            if system is None:
+                response = await self._create(
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+            else:
+                response = await self._create(
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system
+                )
+
+            if debug:
+                logger.debug("Received response from Anthropic API")
+                logger.debug("Response ID: %s", response.id)
+
+            api_response = _to_api_response(response)
+
+            if debug:
+                content = api_response.content
+                logger.debug("Created APIResponse object")
+                logger.debug("Response content preview: %s", content[:100] if content else "Empty content")
+
+            return api_response
+
+        except RateLimitError as e:
+            logger.warning("Rate limited in send_message: %s", str(e))
+            # Surface the server's Retry-After so callers can back off for exactly that long
+            try:
+                retry_after = float(e.response.headers.get("retry-after"))
+            except (AttributeError, TypeError, ValueError):
+                retry_after = None
+            return APIResponse(
+                content="",
+                request_id="",
+                success=False,
+                error=str(e),
+                metadata={"rate_limited": True, "retry_after": retry_after}
+            )
+
+        except Exception as e:
+            logger.error("Error in send_message: %s", str(e))
+            return APIResponse(
+                content="",
+                request_id="",
+                success=False,
+                error=str(e)
+            )
+
+    @logs_and_exceptions(logger)
+    async def send_messages_bulk(
+        self,
+        batch: List[List[Dict[str, Any]]],
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        concurrency: int = 16
+    ) -> List[APIResponse]:
+        """Send several conversations concurrently.
 
         Args:
-            response: Streaming response from Anthropic
+            batch: One list of message dicts per conversation
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate per response
+            concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            List of APIResponse objects, in batch order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(messages: List[Dict[str, Any]]) -> APIResponse:
+            async with semaphore:
+                return await self.send_message(messages, temperature=temperature, max_tokens=max_tokens)
+
+        logger.info("Sending %d messages to Anthropic API with concurrency %d", len(batch), concurrency)
+        return await asyncio.gather(*(send(messages) for messages in batch))
+
+    @logs_and_exceptions(logger)
+    async def send_message_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: float = 30.0
+    ) -> List[APIResponse]:
+        """Send requests through the Message Batches API and wait for the results.
+
+        Requests are submitted in batches of up to 10,000, which are billed at half
+        price but can take minutes to hours to finish, so this suits offline workloads only.
+
+        Args:
+            requests: Request dicts with "messages" and optionally "max_tokens",
+                "temperature" and "system"
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            List of APIResponse objects, in request order
+        """
+        batch_requests = []
+        for i, request in enumerate(requests):
+            params = {
+                "model": self.model,
+                "messages": request["messages"],
+                "max_tokens": request.get("max_tokens", 1024),
+                "temperature": request.get("temperature", 0.0)
+            }
+            if request.get("system") is not None:
+                params["system"] = request["system"]
+            # Indexes run across batches, so custom_id maps every result back to its request
+            batch_requests.append({"custom_id": f"r{i}", "params": params})
+
+        # Submit every batch before waiting on any, so they are processed side by side
+        batch_ids = []
+        for start in range(0, len(batch_requests), _MAX_BATCH_REQUESTS):
+            chunk = batch_requests[start:start + _MAX_BATCH_REQUESTS]
+            batch = await self.client.messages.batches.create(requests=chunk)
+            logger.info("Submitted message batch %s with %d requests", batch.id, len(chunk))
+            batch_ids.append(batch.id)
+
+        responses: List[Optional[APIResponse]] = [None] * len(requests)
+        for batch_id in batch_ids:
+            batch = await self.client.messages.batches.retrieve(batch_id)
+            while batch.processing_status != "ended":
+                await asyncio.sleep(poll_interval)
+                batch = await self.client.messages.batches.retrieve(batch_id)
+
+            # Results arrive in any order
+            async for entry in await self.client.messages.batches.results(batch_id):
+                index = int(entry.custom_id[1:])
+                if entry.result.type == "succeeded":
+                    responses[index] = _to_api_response(entry.result.message)
+                else:
+                    error = getattr(entry.result, "error", None)
+                    responses[index] = APIResponse(
+                        content="",
+                        request_id="",
+                        success=False,
+                        error=str(error) if error is not None else entry.result.type
+                    )
+
+            logger.info("Message batch %s ended", batch_id)
+
+        return [
+            response if response is not None else APIResponse(
+                content="",
+                request_id="",
+                success=False,
+                error="No result returned for batch request"
+            )
+            for response in responses
+        ]
+
+    @logs_and_exceptions(logger)
+    async def stream_to_file(
+        self,
+        messages: List[Dict[str, Any]],
+        path: Union[str, os.PathLike],
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        system: Optional[Union[str, List[Dict[str, Any]]]] = None
+    ) -> int:
+        """Stream a response straight into a UTF-8 text file.
+
+        Text deltas are written through a 64 KiB buffer as they arrive, so memory
+        use doesn't grow with the length of the response.
+
+        Args:
+            messages: List of message dicts with role and content
+            path: File to write the response text to (overwritten)
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            system: Optional system prompt, as a string or a list of content blocks
+
+        Returns:
+            Number of characters written
+        """
+        message_params = {
+            "messages": messages,
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        if system is not None:
+            message_params["system"] = system
+
+        written = 0
+        with open(path, "w", encoding="utf-8", buffering=65536) as f:
+            async with self.client.messages.stream(**message_params) as stream:
+                async for text in stream.text_stream:
+                    written += f.write(text)
+
+        logger.info("Streamed %d characters to %s", written, path)
+        return written
+
+    async def _stream_response(
+        self,
+        message_params: Dict[str, Any],
+        batch_window: float = 0.05
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response from the Anthropic API.
+
+        Text deltas are coalesced and yielded every batch_window seconds (or once
+        more than 512 characters are buffered) so consumers aren't resumed per token.
+
+        Args:
+            message_params: Parameters for the messages API call
+            batch_window: Seconds to coalesce deltas; 0 yields every delta
 
         Yields:
             Text content from stream
         """
         try:
-            async for chunk in response:
-                if hasattr(chunk, 'content') and chunk.content:
-                    yield chunk.content[0].text
-                await asyncio.sleep(0)  # Yield control
+            async with self.client.messages.stream(**message_params) as stream:
+                if batch_window <= 0:
+                    async for text in stream.text_stream:
+                        yield text
+                    return
+
+                loop = asyncio.get_running_loop()
+                buffer: List[str] = []
+                buffered = 0
+                last_flush = loop.time()
+                async for text in stream.text_stream:
+                    buffer.append(text)
+                    buffered += len(text)
+                    now = loop.time()
+                    if now - last_flush >= batch_window or buffered > 512:
+                        yield "".join(buffer)
+                        buffer.clear()
+                        buffered = 0
+                        last_flush = now
+
+                if buffer:
+                    yield "".join(buffer)
 
         except Exception as e:
             logger.error("Error in stream processing: %s", str(e))
@@ -177,5 +442,8 @@ class AnthropicHelper:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        self.client = None
+        """Async context manager exit.
+
+        The underlying client and its connection pool are shared by every helper on
+        the event loop, so they are left open.
+        """
@@ -1,6 +1,9 @@
 # tkr_bias_stories/tkr_utils/helper_anthropic/processor.py
 
 import asyncio
+import logging
+import random
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from tkr_utils import setup_logging, logs_and_exceptions
@@ -19,7 +22,9 @@ class RequestProcessor:
         client: AnthropicHelper,
         rate_limits: Optional[RateLimits] = None,
         max_concurrent: int = 5,
-        chunk_size: int = 10
+        chunk_size: int = 10,
+        system: Optional[str] = None,
+        offline_threshold: Optional[int] = None
     ):
         """Initialize the request processor.
 
@@ -28,26 +33,30 @@ class RequestProcessor:
             rate_limits: Optional RateLimits configuration
             max_concurrent: Maximum number of concurrent requests
             chunk_size: Size of request chunks for batch processing
+            system: Optional system prompt shared by every request that doesn't set its own.
+                It is sent as a prompt-cache breakpoint, so the shared prefix is cached server-side.
+            offline_threshold: If set, process_batch sends batches of at least this many requests
+                through the Message Batches API (half price, but results can take hours)
         """
         self.client = client
+        self.system = system
+        self.offline_threshold = offline_threshold
 
-        # Configure rate limits
+        # Configure rate limits; values may be loosely typed (e.g. env strings), and the
+        # token buckets need ints
         if rate_limits:
+            self.rate_limits = RateLimits.from_any(rate_limits.requests_per_minute, rate_limits.tokens_per_minute)
             logger.info(
                 "Using provided rate limits: %d requests/min, %d tokens/min",
-                rate_limits.requests_per_minute,
-                rate_limits.tokens_per_minute
+                self.rate_limits.requests_per_minute,
+                self.rate_limits.tokens_per_minute
             )
-            self.rate_limits = rate_limits
         else:
+            self.rate_limits = RateLimits.from_any(MAX_REQUESTS_PER_MINUTE, MAX_TOKENS_PER_MINUTE)
             logger.info(
                 "Using default rate limits: %d requests/min, %d tokens/min",
-                MAX_REQUESTS_PER_MINUTE,
-                MAX_TOKENS_PER_MINUTE
-            )
-            self.rate_limits = RateLimits(
-                requests_per_minute=MAX_REQUESTS_PER_MINUTE,
-                tokens_per_minute=MAX_TOKENS_PER_MINUTE
+                self.rate_limits.requests_per_minute,
+                self.rate_limits.tokens_per_minute
             )
 
         # Initialize request manager
@@ -57,21 +66,31 @@ class RequestProcessor:
             chunk_size=chunk_size
         )
 
-        # Processing statistics
-        self.stats = {
-            "processed": 0,
-            "failed": 0,
-            "total_chunks": 0,
-            "active_requests": 0
-        }
-        self._stats_lock = asyncio.Lock()
+        # Shared backoff after a 429: no new request starts before _backoff_until
+        # (time.monotonic()), and consecutive 429s back off exponentially
+        self._backoff_until = 0.0
+        self._backoff_attempt = 0
+
+        # Processing statistics, as plain ints: updates never span an await, so
+        # they're atomic within the event loop and need no lock
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        """Reset the processing statistics."""
+        self.processed = 0
+        self.failed = 0
+        self.total_chunks = 0
+        self.active_requests = 0
 
-    async def _update_stats(self, **kwargs: Dict[str, int]) -> None:
-        """Thread-safe update of processing statistics."""
-        async with self._stats_lock:
-            for key, value in kwargs.items():
-                if key in self.stats:
-                    self.stats[key] += value
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the processing statistics."""
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "total_chunks": self.total_chunks,
+            "active_requests": self.active_requests
+        }
 
     @logs_and_exceptions(logger)
     async def _process_single_request(
@@ -87,10 +106,11 @@ class RequestProcessor:
             APIResponse object
         """
         try:
-            await self._update_stats(active_requests=1)
+            self.active_requests += 1
 
-            logger.debug("Processing single request")
-            logger.debug("Request content: %s", request.get("content", "")[:100])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Processing single request")
+                logger.debug("Request content: %s", request.get("content", "")[:100])
 
             # Format request for AnthropicHelper
             messages = [{
@@ -98,19 +118,27 @@ class RequestProcessor:
                 "content": request["content"]
             }]
 
+            # Reuse the processor-wide system prompt so every request sends identical prefix bytes
+            system = request.get("system", self.system)
+
             # Send request with proper parameters
             response = await self.client.send_message(
                 messages=messages,
                 temperature=request.get("temperature", 0.7),
-                max_tokens=request.get("max_tokens", 1024)
+                max_tokens=request.get("max_tokens", 1024),
+                system=system,
+                cache_prefix=system is not None
             )
 
             if response.success:
+                self._backoff_attempt = 0
                 await self.request_manager.record_success()
                 logger.info("Successfully processed request: %s", response.request_id)
                 return response
             else:
                 logger.error("Failed to process request: %s", response.error)
+                if response.metadata and response.metadata.get("rate_limited"):
+                    self._back_off(response.metadata.get("retry_after"))
                 await self.request_manager.record_failure()
                 return response
 
@@ -124,9 +152,105 @@ class RequestProcessor:
                 error=str(e)
             )
         finally:
-            await self._update_stats(active_requests=-1)
+            self.active_requests -= 1
             await self.request_manager.release_permit()
 
+    def _back_off(self, retry_after: Optional[float]) -> None:
+        """Delay new requests after a rate limit response.
+
+        Uses the server's Retry-After when given, otherwise full-jitter
+        exponential backoff capped at 60 seconds.
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if any
+        """
+        self._backoff_attempt += 1
+        if retry_after is None:
+            retry_after = random.uniform(0, min(60, 2 ** self._backoff_attempt))
+        self._backoff_until = max(self._backoff_until, time.monotonic() + max(1.0, retry_after))
+        logger.warning("Rate limited, backing off new requests for %.1fs", self._backoff_until - time.monotonic())
+
+    async def _wait_out_backoff(self) -> None:
+        """Sleep until any rate limit backoff has passed."""
+        # Loop, since another 429 may extend the backoff while we sleep
+        while (delay := self._backoff_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    async def _acquire_and_process(self, request: Dict[str, Any]) -> APIResponse:
+        """Wait for any rate limit backoff and a request permit, then process the request."""
+        await self._wait_out_backoff()
+
+        # Rough token estimate for the rate limiter: ~4 characters per input token
+        est_tokens = request.get("max_tokens", 1024) + len(request.get("content", "")) // 4
+        if not await self.request_manager.acquire_permit(est_tokens):
+            return APIResponse(
+                content="",
+                request_id="",
+                success=False,
+                error="Request rejected by rate limiter or circuit breaker"
+            )
+
+        # A 429 may have started a backoff while we waited for the permit. The permit is
+        # kept while sleeping, so requests queued behind this one can't slip past it.
+        try:
+            await self._wait_out_backoff()
+        except BaseException:
+            await self.request_manager.release_permit()
+            raise
+        return await self._process_single_request(request)
+
+    async def process_chunk(
+        self,
+        chunk: List[Dict[str, Any]]
+    ) -> List[APIResponse]:
+        """Process a chunk of requests concurrently.
+
+        Every request in the chunk is started at once, and each one begins its API
+        call as soon as it gets a permit; the request manager's semaphore bounds how
+        many calls are actually in flight. Permits aren't pre-acquired for the whole
+        chunk, since a chunk larger than max_concurrent would wait forever on
+        permits that are only released by requests that haven't started.
+
+        Args:
+            chunk: List of request dictionaries
+
+        Returns:
+            List of APIResponse objects, in request order
+        """
+        # An open circuit rejects every request, so fail the chunk without scheduling it
+        if not self.request_manager.circuit_breaker.can_execute():
+            logger.warning("Circuit breaker open, rejecting chunk of %d requests", len(chunk))
+            self.failed += len(chunk)
+            return [
+                APIResponse(
+                    content="",
+                    request_id="",
+                    success=False,
+                    error="Request rejected by circuit breaker"
+                )
+                for _ in chunk
+            ]
+
+        results = await asyncio.gather(
+            *(self._acquire_and_process(request) for request in chunk),
+            return_exceptions=True
+        )
+
+        responses = [
+            result if isinstance(result, APIResponse) else APIResponse(
+                content="",
+                request_id="",
+                success=False,
+                error=str(result)
+            )
+            for result in results
+        ]
+
+        succeeded = sum(1 for response in responses if response.success)
+        self.processed += succeeded
+        self.failed += len(responses) - succeeded
+        return responses
+
     async def process_batch(
         self,
         requests: List[Dict[str, Any]]
@@ -139,35 +263,30 @@ class RequestProcessor:
         Returns:
             List of APIResponse objects
         """
+        if self.offline_threshold is not None and len(requests) >= self.offline_threshold:
+            return await self.process_batch_offline(requests)
+
         logger.info("Starting batch processing of %d requests", len(requests))
 
         # Reset stats
-        self.stats = {
-            "processed": 0,
-            "failed": 0,
-            "total_chunks": 0,
-            "active_requests": 0
-        }
+        self._reset_stats()
 
-        # Chunk requests
+        # Chunk requests lazily; the chunk count is known from the request count
         chunks = self.request_manager.chunk_requests(requests)
-        await self._update_stats(total_chunks=len(chunks))
+        total_chunks = -(-len(requests) // self.request_manager.chunk_size)
+        self.total_chunks = total_chunks
 
         all_responses = []
 
         try:
             async with self.request_manager:
                 for i, chunk in enumerate(chunks, 1):
-                    logger.info("Processing chunk %d/%d", i, len(chunks))
+                    logger.info("Processing chunk %d/%d", i, total_chunks)
 
                     try:
                         chunk_responses = await self.process_chunk(chunk)
                         all_responses.extend(chunk_responses)
 
-                        # Add delay between chunks if needed
-                        if i < len(chunks):
-                            await asyncio.sleep(0.1)
-
                     except Exception as e:
                         logger.error("Error processing chunk %d: %s", i, str(e))
                         # Add failed responses for the chunk
@@ -179,27 +298,82 @@ class RequestProcessor:
                                 error=f"Chunk {i} failed: {str(e)}"
                             ) for _ in chunk
                         ])
-                        await self._update_stats(failed=len(chunk))
+                        self.failed += len(chunk)
 
         except Exception as e:
             logger.error("Batch processing error: %s", str(e))
         finally:
             logger.info(
                 "Batch processing completed. Processed: %d, Failed: %d, Total Chunks: %d",
-                self.stats["processed"],
-                self.stats["failed"],
-                self.stats["total_chunks"]
+                self.processed,
+                self.failed,
+                self.total_chunks
             )
 
         return all_responses
 
+    async def process_batch_offline(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: float = 30.0
+    ) -> List[APIResponse]:
+        """Process a batch of requests through the Message Batches API.
+
+        Any number of requests can be given; they are submitted in batches of up to 10,000.
+
+        Args:
+            requests: List of request dictionaries
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            List of APIResponse objects, in request order
+        """
+        logger.info("Starting offline batch processing of %d requests", len(requests))
+
+        # Reset stats
+        self._reset_stats()
+        self.total_chunks = 1
+
+        batch_requests = [
+            {
+                "messages": [{"role": "user", "content": request["content"]}],
+                "temperature": request.get("temperature", 0.7),
+                "max_tokens": request.get("max_tokens", 1024),
+                "system": request.get("system", self.system)
+            }
+            for request in requests
+        ]
+
+        try:
+            responses = await self.client.send_message_batch(batch_requests, poll_interval)
+        except Exception as e:
+            logger.error("Offline batch processing error: %s", str(e))
+            responses = [
+                APIResponse(
+                    content="",
+                    request_id="",
+                    success=False,
+                    error=f"Batch failed: {str(e)}"
+                )
+                for _ in requests
+            ]
+
+        succeeded = sum(1 for response in responses if response.success)
+        self.processed += succeeded
+        self.failed += len(responses) - succeeded
+        logger.info(
+            "Offline batch processing completed. Processed: %d, Failed: %d",
+            self.processed,
+            self.failed
+        )
+        return responses
+
     async def get_processing_stats(self) -> Dict[str, Any]:
         """Get current processing statistics."""
-        async with self._stats_lock:
-            stats_copy = self.stats.copy()
-            total = stats_copy["processed"] + stats_copy["failed"]
-            stats_copy["success_rate"] = (
-                (stats_copy["processed"] / total * 100)
-                if total > 0 else 0
-            )
-            return stats_copy
+        stats_copy = self.stats
+        total = stats_copy["processed"] + stats_copy["failed"]
+        stats_copy["success_rate"] = (
+            (stats_copy["processed"] / total * 100)
+            if total > 0 else 0
+        )
+        return stats_copy
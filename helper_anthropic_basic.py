@@ -1,30 +1,40 @@
 from typing import List, Dict, Any
-from dotenv import load_dotenv
 from anthropic import Anthropic
 
 from .config import ANTHROPIC_API_KEY, ANTHROPIC_MODEL
 from tkr_utils import setup_logging, logs_and_exceptions
+from tkr_utils._env import ensure_env
+from tkr_utils._stdout import write_buffered
+from tkr_utils._response_cache import ResponseCache
 
 # Setup logging
 logger = setup_logging(__file__)
 
 # Load environment variables from .env file
-load_dotenv()
+ensure_env()
+
+# System prompt for send_message_json
+_JSON_SYSTEM_MESSAGE = "Always respond in valid JSON format."
 
 class AnthropicHelper:
     @logs_and_exceptions(logger)
-    def __init__(self, api_key: str = ANTHROPIC_API_KEY, model: str = ANTHROPIC_MODEL):
+    def __init__(self, api_key: str = ANTHROPIC_API_KEY, model: str = ANTHROPIC_MODEL, enable_cache: bool = True, cache_size: int = 1024):
         """
         Initialize the Anthropic client.
 
         Args:
             api_key: Anthropic API key
             model: Model to use for completions
+            enable_cache: Cache responses to deterministic (temperature 0) requests
+            cache_size: Maximum number of cached responses
         """
         self.api_key = api_key
         self.model = model
         self.client = Anthropic(api_key=self.api_key)
 
+        self.enable_cache = enable_cache
+        self._cache: ResponseCache[str] = ResponseCache(cache_size)
+
         logger.info("AnthropicHelper initialized with model: %s", self.model)
 
     @logs_and_exceptions(logger)
@@ -40,6 +50,14 @@ class AnthropicHelper:
         Returns:
             Dict containing the API response
         """
+        cache_key = None
+        if self.enable_cache and temperature == 0:
+            cache_key = self._cache.key(m=self.model, msgs=messages, mt=max_tokens)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached response")
+                return cached
+
         logger.debug("Sending message to Anthropic API with model: %s", self.model)
         response = self.client.messages.create(
             model=self.model,
@@ -49,7 +67,9 @@ class AnthropicHelper:
         )
         logger.debug("Message sent successfully")
         # Extract text from first content block
-        return response.content[0].text if response.content else ""
+        text = response.content[0].text if response.content else ""
+        self._cache.put(cache_key, text)
+        return text
 
     @logs_and_exceptions(logger)
     def send_message_json(self, messages: List[Dict[str, Any]], temperature: float = 0.0, max_tokens: int = 1024) -> str:
@@ -64,21 +84,28 @@ class AnthropicHelper:
         Returns:
             String containing the response text
         """
-        logger.debug("Sending JSON message to Anthropic API with model: %s", self.model)
+        cache_key = None
+        if self.enable_cache and temperature == 0:
+            cache_key = self._cache.key(m=self.model, msgs=messages, mt=max_tokens, sys=_JSON_SYSTEM_MESSAGE)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached JSON response")
+                return cached
 
-        # Add system message as a top-level parameter
-        system_message = "Always respond in valid JSON format."
+        logger.debug("Sending JSON message to Anthropic API with model: %s", self.model)
 
         response = self.client.messages.create(
             model=self.model,
-            system=system_message,  # System message as top-level parameter
+            system=_JSON_SYSTEM_MESSAGE,  # System message as top-level parameter
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens
         )
         logger.debug("JSON message sent successfully")
         # Extract text from first content block
-        return response.content[0].text if response.content else ""
+        text = response.content[0].text if response.content else ""
+        self._cache.put(cache_key, text)
+        return text
 
     @logs_and_exceptions(logger)
     def stream_response(self, messages: List[Dict[str, Any]], max_tokens: int = 1024) -> None:
@@ -96,9 +123,7 @@ class AnthropicHelper:
             max_tokens=max_tokens,
             stream=True
         ) as stream:
-            for chunk in stream:
-                if chunk.type == 'content_block_delta':
-                    print(chunk.delta.text, end="")
+            write_buffered(chunk.delta.text for chunk in stream if chunk.type == 'content_block_delta')
         logger.debug("Streaming completed")
 
 # Example usage
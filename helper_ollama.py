@@ -1,8 +1,10 @@
 # openai_helper.py
 from typing import List, Dict, Any
-from dotenv import load_dotenv
 from openai import OpenAI
 from tkr_utils import setup_logging, logs_and_exceptions
+from tkr_utils._env import ensure_env
+from tkr_utils._stdout import write_buffered
+from tkr_utils._response_cache import ResponseCache
 
 # Setup logging
 logger = setup_logging(__file__)
@@ -18,14 +20,18 @@ client = client = OpenAI(
 )
 
 # Load environment variables from .env file
-load_dotenv()
+ensure_env()
 
 class OpenAIHelper:
     @logs_and_exceptions(logger)
-    def __init__(self, api_key: str = OLLAMA_API_KEY, model: str = OLLAMA_MODEL, embedder: str = OLLAMA_EMBEDDER):
+    def __init__(self, api_key: str = OLLAMA_API_KEY, model: str = OLLAMA_MODEL, embedder: str = OLLAMA_EMBEDDER, enable_cache: bool = True, cache_size: int = 1024):
         self.api_key = api_key
         self.model = model
         self.embedder = embedder
+
+        self.enable_cache = enable_cache
+        self._cache: ResponseCache[Any] = ResponseCache(cache_size)
+
         logger.info("OpenAIHelper initialized with model: %s and embedder: %s", self.model, self.embedder)
 
     @logs_and_exceptions(logger)
@@ -40,12 +46,21 @@ class OpenAIHelper:
         Returns:
             Dict[str, Any]: Response from the OpenAI API.
         """
+        cache_key = None
+        if self.enable_cache and temperature == 0:
+            cache_key = self._cache.key(m=self.model, msgs=messages)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached response.")
+                return cached
+
         try:
             logger.info("Sending message to OpenAI API with model: %s", self.model)
             response = client.chat.completions.create(model=self.model,
             messages=messages,
             temperature=temperature)
             logger.info("Message sent successfully.")
+            self._cache.put(cache_key, response)
             return response
         except Exception as e:
             logger.error("An error occurred while sending the message: %s", e)
@@ -64,9 +79,11 @@ class OpenAIHelper:
             stream = client.chat.completions.create(model=self.model,
             messages=messages,
             stream=True)
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    print(chunk.choices[0].delta.content, end="")
+            write_buffered(
+                chunk.choices[0].delta.content
+                for chunk in stream
+                if chunk.choices[0].delta.content is not None
+            )
             logger.info("Streaming completed.")
         except Exception as e:
             logger.error("An error occurred while streaming the response: %s", e)
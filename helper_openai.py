@@ -1,61 +1,121 @@
 import asyncio
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-from openai import OpenAI, AsyncOpenAI
+import os
+from typing import List, Dict, Any, Optional, Union
+import httpx2
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
 
 from .config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_EMBEDDER
 from tkr_utils import setup_logging, logs_and_exceptions
+from tkr_utils._env import ensure_env
+from tkr_utils._loop_clients import LoopClients
+from tkr_utils._stdout import write_buffered, write_buffered_async
+from tkr_utils._response_cache import ResponseCache
 
 
 # Setup logging
 logger = setup_logging(__file__)
 
 # Load environment variables from .env file
-load_dotenv()
+ensure_env()
+
+# AsyncOpenAI clients keyed by API key, sharing one HTTP/2 connection pool per event loop
+_async_clients: LoopClients[AsyncOpenAI] = LoopClients(
+    lambda: DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx2.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=Timeout(600.0, connect=5.0)
+    ),
+    lambda api_key, pool: AsyncOpenAI(api_key=api_key, http_client=pool)
+)
+
+def _get_async_client(api_key: str) -> AsyncOpenAI:
+    """Get the running loop's shared AsyncOpenAI client for an API key, creating it on first use."""
+    return _async_clients.get(api_key)
 
 class OpenAIHelper:
     @logs_and_exceptions(logger)
-    def __init__(self, api_key: str = OPENAI_API_KEY, model: str = OPENAI_MODEL, embedder: str = OPENAI_EMBEDDER, async_mode: bool = False):
+    def __init__(self, api_key: str = OPENAI_API_KEY, model: str = OPENAI_MODEL, embedder: str = OPENAI_EMBEDDER, async_mode: bool = False, enable_cache: bool = True, cache_size: int = 1024):
         self.api_key = api_key
         self.model = model
         self.embedder = embedder
         self.async_mode = async_mode
 
-        if self.async_mode:
-            self.client = AsyncOpenAI(api_key=self.api_key)
-        else:
-            self.client = OpenAI(api_key=self.api_key)
+        self.enable_cache = enable_cache
+        self._cache: ResponseCache[Any] = ResponseCache(cache_size)
+
+        # In async mode the client is looked up per event loop, see the client property
+        self._sync_client = None if self.async_mode else OpenAI(api_key=self.api_key)
 
         logger.info("OpenAIHelper initialized with model: %s, embedder: %s, and async_mode: %s", self.model, self.embedder, self.async_mode)
 
+    @property
+    def client(self) -> Union[OpenAI, AsyncOpenAI]:
+        """The sync client, or in async mode the running loop's shared async client."""
+        if self.async_mode:
+            return _get_async_client(self.api_key)
+        return self._sync_client
+
+    def _cache_key(self, messages: List[Dict[str, Any]], temperature: float, fmt: str = "text") -> Optional[str]:
+        """
+        Get the cache/deduplication key for a request, or None for non-deterministic
+        (temperature above 0) requests, which are always sent.
+        """
+        if temperature != 0:
+            return None
+        return self._cache.key(m=self.model, msgs=messages, fmt=fmt)
+
     @logs_and_exceptions(logger)
     async def send_message_async(self, messages: List[Dict[str, Any]], temperature: float = 0.0) -> Dict[str, Any]:
         """
         Send an asynchronous message to the OpenAI API and return the response.
         """
-        logger.debug("Sending async message to OpenAI API with model: %s", self.model)
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature
-        )
-        logger.debug("Async message sent successfully.")
-        return response
+        async def call() -> Dict[str, Any]:
+            logger.debug("Sending async message to OpenAI API with model: %s", self.model)
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature
+            )
+            logger.debug("Async message sent successfully.")
+            return response
+
+        return await self._cache.fetch(self._cache_key(messages, temperature), call, self.enable_cache)
 
     @logs_and_exceptions(logger)
     async def send_message_json_async(self, messages: List[Dict[str, Any]], temperature: float = 0.0) -> Dict[str, Any]:
         """
         Send an asynchronous message to the OpenAI API and return the response.
         """
-        logger.info("Sending async message to OpenAI API with model: %s", self.model)
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            response_format={"type": "json_object"}
-        )
-        logger.debug("Async message sent successfully.")
-        return response
+        async def call() -> Dict[str, Any]:
+            logger.info("Sending async message to OpenAI API with model: %s", self.model)
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"}
+            )
+            logger.debug("Async message sent successfully.")
+            return response
+
+        return await self._cache.fetch(self._cache_key(messages, temperature, fmt="json_object"), call, self.enable_cache)
+
+    @logs_and_exceptions(logger)
+    async def send_messages_bulk(self, batch: List[List[Dict[str, Any]]], temperature: float = 0.0, concurrency: int = 16) -> List[Dict[str, Any]]:
+        """
+        Send several conversations concurrently and return the responses in order.
+        At most `concurrency` requests are in flight at once.
+        """
+        if not self.async_mode:
+            raise RuntimeError("Cannot call send_messages_bulk in sync mode. Use async_mode=True.")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.send_message_async(messages, temperature)
+
+        logger.info("Sending %d messages to OpenAI API with concurrency %d", len(batch), concurrency)
+        return await asyncio.gather(*(send(messages) for messages in batch))
 
     @logs_and_exceptions(logger)
     def send_message(self, messages: List[Dict[str, Any]], temperature: float = 0.0) -> Dict[str, Any]:
@@ -65,6 +125,12 @@ class OpenAIHelper:
         if self.async_mode:
             raise RuntimeError("Cannot call send_message in async mode. Use send_message_async instead.")
 
+        cache_key = self._cache_key(messages, temperature) if self.enable_cache else None
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Returning cached response.")
+            return cached
+
         logger.info("Sending message to OpenAI API with model: %s", self.model)
         response = self.client.chat.completions.create(
             model=self.model,
@@ -72,6 +138,7 @@ class OpenAIHelper:
             temperature=temperature
         )
         logger.debug("Message sent successfully.")
+        self._cache.put(cache_key, response)
         return response
 
     @logs_and_exceptions(logger)
@@ -85,11 +152,38 @@ class OpenAIHelper:
             messages=messages,
             stream=True
         )
-        async for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                print(chunk.choices[0].delta.content, end="")
+        await write_buffered_async(
+            chunk.choices[0].delta.content
+            async for chunk in stream
+            if chunk.choices[0].delta.content is not None
+        )
         logger.debug("Async streaming completed.")
 
+    @logs_and_exceptions(logger)
+    async def stream_to_file(self, messages: List[Dict[str, Any]], path: Union[str, os.PathLike], temperature: float = 0.0) -> int:
+        """
+        Stream a response asynchronously straight into a UTF-8 text file, through a 64 KiB
+        buffer, so memory use doesn't grow with the length of the response.
+        Returns the number of characters written.
+        """
+        if not self.async_mode:
+            raise RuntimeError("Cannot call stream_to_file in sync mode. Use async_mode=True.")
+
+        logger.info("Starting to stream response to %s from OpenAI API with model: %s", path, self.model)
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            stream=True
+        )
+        written = 0
+        with open(path, "w", encoding="utf-8", buffering=65536) as f:
+            async for chunk in stream:
+                if chunk.choices[0].delta.content is not None:
+                    written += f.write(chunk.choices[0].delta.content)
+        logger.debug("Streamed %d characters to %s", written, path)
+        return written
+
     @logs_and_exceptions(logger)
     def stream_response(self, messages: List[Dict[str, Any]]) -> None:
         """
@@ -104,9 +198,11 @@ class OpenAIHelper:
             messages=messages,
             stream=True
         )
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                print(chunk.choices[0].delta.content, end="")
+        write_buffered(
+            chunk.choices[0].delta.content
+            for chunk in stream
+            if chunk.choices[0].delta.content is not None
+        )
         logger.debug("Streaming completed.")
 
 # Example usage
@@ -28,7 +28,7 @@ def test_openai_helper_sync():
     myChat = OpenAIHelper()
     messages = [{"role": "user", "content": "Say this is a test!"}]
     response = myChat.send_message(messages)
-    logger.info(f"Response: {response}")
+    logger.info("Response: %s", response)
     return response
 
 @logs_and_exceptions(logger)
@@ -38,7 +38,7 @@ async def test_openai_helper_async():
     myChat = OpenAIHelper(async_mode=True)
     messages = [{"role": "user", "content": "Say this is a test!"}]
     response = await myChat.send_message_async(messages)
-    logger.info(f"Response: {response}")
+    logger.info("Response: %s", response)
     return response
 
 if __name__ == "__main__":
@@ -55,5 +55,5 @@ if __name__ == "__main__":
     logger.info(openai_response_async)  # Log the response from OpenAI API (async)
 
     # Show usage of AppPaths.DOCS_DIR
-    logger.info(f"Documents directory: {AppPaths.DOCS_DIR}")
-    logger.info(f"Custom data directory: {AppPaths.CUSTOM_DATA_STORE}")
+    logger.info("Documents directory: %s", AppPaths.DOCS_DIR)
+    logger.info("Custom data directory: %s", AppPaths.CUSTOM_DATA_STORE)
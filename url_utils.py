@@ -1,7 +1,8 @@
 # tkr_utils/url_utils.py
 
-from urllib.parse import urlparse, urljoin, urlunparse
-from typing import Optional, Tuple, List
+from urllib.parse import urlparse, urljoin, urlunparse, ParseResult
+from typing import Iterable, Optional, Tuple, List, Set
+import functools
 import re
 import os
 from tkr_utils import setup_logging, logs_and_exceptions
@@ -10,18 +11,69 @@ from tkr_utils.extract_url import extract_url
 
 logger = setup_logging(__file__)
 
+_SCHEME_RE = re.compile(r'^https?://(www\.)?')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+# Characters urlparse treats specially when finding the netloc (or strips/validates),
+# so URLs containing them skip the is_same_domain fast path
+_NETLOC_SLOW_CHARS = frozenset('?#[]\t\r\n')
+
+@functools.lru_cache(maxsize=4096)
+def _parse(url: str) -> ParseResult:
+    """urlparse with a cache, since crawlers parse the same URLs repeatedly."""
+    return urlparse(url)
+
+def _fast_netloc(url: str) -> Optional[str]:
+    """Get the netloc of a plain ASCII http(s) URL without urlparse, or None to fall back."""
+    if url.startswith('https://'):
+        rest = url[8:]
+    elif url.startswith('http://'):
+        rest = url[7:]
+    else:
+        return None
+    if not url.isascii() or not _NETLOC_SLOW_CHARS.isdisjoint(rest):
+        return None
+    return rest.split('/', 1)[0]
+
+# Save directories already created this process, so repeat calls skip the mkdir syscalls
+_created_dirs: Set[str] = set()
+
+class _FilenameTable(dict):
+    """str.translate table mapping every character except ASCII letters and digits to '_'."""
+
+    def __missing__(self, codepoint: int) -> str:
+        # Anything not pre-filled (including all non-ASCII) is replaced; remember it for next time
+        self[codepoint] = '_'
+        return '_'
+
+_FILENAME_TABLE = _FilenameTable(
+    (c, c) for c in range(128) if chr(c).isalnum()
+)
+
 class URLUtils:
     @staticmethod
     @logs_and_exceptions(logger)
     def parse_url(url: str) -> Tuple[str, str, str, str, str, str]:
-        parsed = urlparse(url)
+        parsed = _parse(url)
         return parsed.scheme, parsed.netloc, parsed.path, parsed.params, parsed.query, parsed.fragment
 
     @staticmethod
     @logs_and_exceptions(logger)
     def is_valid_url(url: str) -> bool:
+        # urlparse drops tabs and newlines, so only URLs without them can be judged from the raw string
+        if '\t' not in url and '\r' not in url and '\n' not in url:
+            scheme, sep, rest = url.partition('://')
+            # Without '://' there is never both a scheme and a netloc
+            if not sep:
+                return False
+            # Plain alphabetic schemes (http, https, ftp...) need no parsing; anything else
+            # (scheme punctuation, IPv6 brackets, non-ASCII hosts) falls through to urlparse
+            if scheme.isascii() and scheme.isalpha():
+                netloc = rest.partition('/')[0]
+                if netloc.isascii() and not _NETLOC_SLOW_CHARS.intersection(netloc):
+                    return bool(netloc)
         try:
-            result = urlparse(url)
+            result = _parse(url)
             return all([result.scheme, result.netloc])
         except ValueError:
             return False
@@ -29,10 +81,10 @@ class URLUtils:
     @staticmethod
     @logs_and_exceptions(logger)
     def normalize_url(url: str) -> str:
-        parsed = urlparse(url)
+        parsed = _parse(url)
         if not parsed.scheme:
             url = f"http://{url}"
-            parsed = urlparse(url)
+            parsed = _parse(url)
         netloc = parsed.netloc.lower()
         if netloc.startswith('www.'):
             netloc = netloc[4:]
@@ -48,16 +100,20 @@ class URLUtils:
     @logs_and_exceptions(logger)
     def get_domain(url: str) -> Optional[str]:
         try:
-            parsed = urlparse(url)
+            parsed = _parse(url)
             return parsed.netloc
         except ValueError:
             return None
 
     @staticmethod
-    @logs_and_exceptions(logger)
+    @logs_and_exceptions(logger, fast=True)
     def is_same_domain(url1: str, url2: str) -> bool:
-        domain1 = URLUtils.get_domain(url1)
-        domain2 = URLUtils.get_domain(url2)
+        domain1 = _fast_netloc(url1)
+        if domain1 is None:
+            domain1 = URLUtils.get_domain(url1)
+        domain2 = _fast_netloc(url2)
+        if domain2 is None:
+            domain2 = URLUtils.get_domain(url2)
         return domain1 == domain2 if domain1 and domain2 else False
 
     @staticmethod
@@ -68,25 +124,36 @@ class URLUtils:
     @staticmethod
     @logs_and_exceptions(logger)
     def get_url_path_segments(url: str) -> List[str]:
-        parsed = urlparse(url)
+        parsed = _parse(url)
         return [segment for segment in parsed.path.split('/') if segment]
 
     @staticmethod
-    @logs_and_exceptions(logger)
+    @logs_and_exceptions(logger, fast=True)
     def url_to_filename(url: str) -> str:
-        url = re.sub(r'^https?://(www\.)?', '', url)
-        filename = re.sub(r'[^a-zA-Z0-9]', '_', url)
-        filename = re.sub(r'_+', '_', filename)
+        url = _SCHEME_RE.sub('', url)
+        # translate replaces characters in one C loop, then runs of '_' are collapsed
+        filename = _UNDERSCORES_RE.sub('_', url.translate(_FILENAME_TABLE))
         filename = filename.strip('_')
         return filename
 
+    @staticmethod
+    @logs_and_exceptions(logger)
+    def url_to_filenames(urls: Iterable[str]) -> List[str]:
+        # Same as url_to_filename, with the patterns and table bound once for the whole batch
+        strip_scheme = _SCHEME_RE.sub
+        collapse = _UNDERSCORES_RE.sub
+        table = _FILENAME_TABLE
+        return [collapse('_', strip_scheme('', url).translate(table)).strip('_') for url in urls]
+
     @staticmethod
     @logs_and_exceptions(logger)
     def save_dir_info(url: str) -> str:
         filename = URLUtils.url_to_filename(url)
         save_dir = os.path.join(AppPaths.PAGES_DIR, filename)
-        os.makedirs(save_dir, exist_ok=True)
-        logger.info(f"Created save directory for URL {url}: {save_dir}")
+        if save_dir not in _created_dirs:
+            os.makedirs(save_dir, exist_ok=True)
+            _created_dirs.add(save_dir)
+            logger.info("Created save directory for URL %s: %s", url, save_dir)
         return save_dir
 
     @staticmethod
@@ -97,7 +164,7 @@ class URLUtils:
     @staticmethod
     @logs_and_exceptions(logger)
     def url_to_dirname(url: str) -> str:
-        parsed_url = urlparse(url)
+        parsed_url = _parse(url)
         dirname = parsed_url.path.replace('www.', '').replace('.', '_')
-        logger.debug(f"The parsed url: {parsed_url}, The dirname: {dirname}")
+        logger.debug("The parsed url: %s, The dirname: %s", parsed_url, dirname)
         return dirname